@@ -1,9 +1,12 @@
 import click
+import itertools
 import logging
 import sys
 from datetime import datetime
+from sqlalchemy import func, update
+from sqlalchemy.orm import load_only
 from .models import Job, JobStatus, get_db_session, init_db
-from .worker import start_workers
+from .worker import notify_workers, start_workers
 import json
 import os
 from pathlib import Path
@@ -26,16 +29,38 @@ DEFAULT_CONFIG = {
     "log_level": "INFO"
 }
 
+# Parsed config, reused until the file's mtime or size changes
+_CONFIG_CACHE = {"key": None, "data": None}
+
+# Lines per write when printing long listings
+OUTPUT_CHUNK_LINES = 256
+
+# Valid --status values and the JobStatus each one maps to
+_STATUS_CHOICES = tuple(s.value for s in JobStatus)
+_STATUS_BY_VALUE = {s.value: s for s in JobStatus}
+
 def get_config():
     """Load configuration from file or return defaults."""
     config_path = os.path.join(Path.home(), '.queuectl', 'config.json')
-    if os.path.exists(config_path):
-        try:
-            with open(config_path, 'r') as f:
-                return {**DEFAULT_CONFIG, **json.load(f)}
-        except Exception as e:
-            logger.warning(f"Error loading config: {e}. Using defaults.")
-    return DEFAULT_CONFIG
+    try:
+        st = os.stat(config_path)
+    except OSError:
+        return dict(DEFAULT_CONFIG)
+    
+    key = (st.st_mtime_ns, st.st_size)
+    if key == _CONFIG_CACHE["key"]:
+        return dict(_CONFIG_CACHE["data"])
+    
+    try:
+        with open(config_path, 'r') as f:
+            data = {**DEFAULT_CONFIG, **json.load(f)}
+    except Exception as e:
+        logger.warning(f"Error loading config: {e}. Using defaults.")
+        return dict(DEFAULT_CONFIG)
+    
+    _CONFIG_CACHE["key"] = key
+    _CONFIG_CACHE["data"] = data
+    return dict(data)
 
 def save_config(config):
     """Save configuration to file."""
@@ -43,6 +68,18 @@ def save_config(config):
     os.makedirs(os.path.dirname(config_path), exist_ok=True)
     with open(config_path, 'w') as f:
         json.dump(config, f, indent=2)
+    _CONFIG_CACHE["key"] = None
+
+def _echo_lines(lines):
+    """Echo lines in chunks rather than with one write per line."""
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= OUTPUT_CHUNK_LINES:
+            click.echo("\n".join(chunk))
+            chunk = []
+    if chunk:
+        click.echo("\n".join(chunk))
 
 @click.group()
 @click.option('--verbose', '-v', is_flag=True, help='Enable verbose output')
@@ -77,6 +114,7 @@ def add_command(command, max_retries, backoff_base):
         )
         session.add(job)
         session.commit()
+        notify_workers()
         click.echo(f"Added job {job.id}: {command}")
     except Exception as e:
         session.rollback()
@@ -101,31 +139,39 @@ def start_workers_cmd(count):
         raise click.ClickException("Worker failed")
 
 @cli.command()
-@click.option('--status', type=click.Choice([s.value for s in JobStatus]), 
+@click.option('--status', type=click.Choice(_STATUS_CHOICES),
               help='Filter jobs by status')
 @click.option('--limit', type=int, default=50, help='Maximum number of jobs to show')
 def list_jobs(status, limit):
     """List jobs with optional status filter."""
     session = get_db_session()
     try:
-        query = session.query(Job)
+        # Only load the columns we print, and stream rows instead of .all()
+        query = session.query(Job).options(load_only(
+            Job.id, Job.status, Job.attempts, Job.max_attempts,
+            Job.created_at, Job.command
+        ))
         if status:
-            query = query.filter(Job.status == JobStatus(status))
+            query = query.filter(Job.status == _STATUS_BY_VALUE[status])
         
-        jobs = query.order_by(Job.created_at.desc()).limit(limit).all()
+        jobs = query.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit).yield_per(100)
         
-        if not jobs:
+        # Format and display jobs
+        rows = (
+            f"{job.id:<5} {job.status.value:<12} {job.attempts}/{job.max_attempts:<9} "
+            f"{job.created_at.strftime('%Y-%m-%d %H:%M:%S'):<20} {job.command}"
+            for job in jobs
+        )
+        first = next(rows, None)
+        if first is None:
             click.echo("No jobs found")
             return
-            
-        # Format and display jobs
-        click.echo(f"{'ID':<5} {'Status':<12} {'Attempts':<9} {'Created At':<20} Command")
-        click.echo("-" * 80)
-        for job in jobs:
-            click.echo(
-                f"{job.id:<5} {job.status.value:<12} {job.attempts}/{job.max_attempts:<9} "
-                f"{job.created_at.strftime('%Y-%m-%d %H:%M:%S'):<20} {job.command}"
-            )
+        
+        _echo_lines(itertools.chain([
+            f"{'ID':<5} {'Status':<12} {'Attempts':<9} {'Created At':<20} Command",
+            "-" * 80,
+            first
+        ], rows))
     finally:
         session.close()
 
@@ -136,21 +182,21 @@ def show_dlq():
     try:
         jobs = session.query(Job).filter(
             Job.status == JobStatus.DEAD
-        ).order_by(Job.completed_at.desc()).all()
+        ).order_by(Job.completed_at.desc(), Job.id.desc()).all()
         
         if not jobs:
             click.echo("No jobs in Dead Letter Queue")
             return
             
-        click.echo(f"{'ID':<5} {'Failed At':<20} {'Attempts':<9} Command")
-        click.echo("-" * 80)
+        lines = [f"{'ID':<5} {'Failed At':<20} {'Attempts':<9} Command", "-" * 80]
         for job in jobs:
-            click.echo(
+            lines.append(
                 f"{job.id:<5} {job.completed_at.strftime('%Y-%m-%d %H:%M:%S'):<20} "
                 f"{job.attempts}/{job.max_attempts:<9} {job.command}"
             )
             if job.error:
-                click.echo(f"     Error: {job.error.splitlines()[0]}")
+                lines.append(f"     Error: {job.error.splitlines()[0]}")
+        _echo_lines(lines)
     finally:
         session.close()
 
@@ -164,27 +210,33 @@ def retry_dlq(job_ids, retry_all):
         
     session = get_db_session()
     try:
-        query = session.query(Job).filter(Job.status == JobStatus.DEAD)
+        query = update(Job).where(Job.status == JobStatus.DEAD)
         
         if not retry_all:
-            query = query.filter(Job.id.in_(job_ids))
+            query = query.where(Job.id.in_(job_ids))
             
-        jobs = query.all()
+        retried_ids = session.scalars(
+            query.values(
+                status=JobStatus.PENDING,
+                attempts=0,
+                error=None,
+                completed_at=None,
+                next_retry_at=None
+            )
+            .returning(Job.id)
+            .execution_options(synchronize_session=False)
+        ).all()
         
-        if not jobs:
+        if not retried_ids:
             click.echo("No matching jobs found in Dead Letter Queue")
             return
             
-        for job in jobs:
-            job.status = JobStatus.PENDING
-            job.attempts = 0
-            job.error = None
-            job.completed_at = None
-            job.next_retry_at = None
-            click.echo(f"Queued job {job.id} for retry")
+        for job_id in retried_ids:
+            click.echo(f"Queued job {job_id} for retry")
             
         session.commit()
-        click.echo(f"Queued {len(jobs)} job(s) for retry")
+        notify_workers()
+        click.echo(f"Queued {len(retried_ids)} job(s) for retry")
         
     except Exception as e:
         session.rollback()
@@ -199,27 +251,27 @@ def status():
     session = get_db_session()
     try:
         # Get job counts by status
-        status_counts = {
-            status.value: session.query(Job).filter(Job.status == status).count()
-            for status in JobStatus
-        }
+        rows = session.query(Job.status, func.count(Job.id)).group_by(Job.status).all()
+        status_counts = {status.value: 0 for status in JobStatus}
+        status_counts.update({status.value: count for status, count in rows})
         
-        # Get recent activity - show completed jobs first, then by creation time
+        # Get recent activity - most recently finished or created jobs first
         recent_jobs = session.query(Job).order_by(
-            Job.completed_at.desc() if Job.status == JobStatus.COMPLETED else Job.created_at.desc()
-        ).order_by(Job.created_at.desc()).limit(5).all()
+            func.coalesce(Job.completed_at, Job.created_at).desc(), Job.id.desc()
+        ).limit(5).all()
         
         # Display status
-        click.echo("\n=== Queue Status ===")
+        lines = ["\n=== Queue Status ==="]
         for status, count in status_counts.items():
-            click.echo(f"{status.upper()}: {count}")
+            lines.append(f"{status.upper()}: {count}")
             
-        click.echo("\n=== Recent Activity ===")
+        lines.append("\n=== Recent Activity ===")
         for job in recent_jobs:
             status = f"{job.status.value.upper()}"
             if job.completed_at:
                 status += f" at {job.completed_at.strftime('%Y-%m-%d %H:%M:%S')}"
-            click.echo(f"[{job.id}] {job.command[:50]}... ({status})")
+            lines.append(f"[{job.id}] {job.command[:50]}... ({status})")
+        _echo_lines(lines)
             
     finally:
         session.close()
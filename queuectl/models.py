@@ -1,7 +1,7 @@
-from datetime import datetime
 from enum import Enum
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Enum as SQLEnum, ForeignKey
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Enum as SQLEnum, ForeignKey, Index, event, func, text
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.orm import sessionmaker, scoped_session
 import os
 from pathlib import Path
@@ -23,7 +23,7 @@ class Job(Base):
     id = Column(Integer, primary_key=True)
     command = Column(Text, nullable=False)
     status = Column(SQLEnum(JobStatus), default=JobStatus.PENDING, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=func.now())  # evaluated by SQLite in the INSERT
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     attempts = Column(Integer, default=0)
@@ -32,19 +32,58 @@ class Job(Base):
     backoff_base = Column(Integer, default=2)  # Base for exponential backoff
     next_retry_at = Column(DateTime, nullable=True)
     
+    __table_args__ = (
+        # Recent activity in `status`, ordered by last change
+        Index('ix_jobs_recent_activity', func.coalesce(completed_at, created_at)),
+        # Partial indexes over just the rows the worker and DLQ look at, so
+        # they stay small however many completed jobs pile up
+        Index('ix_jobs_pending_fifo', 'created_at', 'id', 'next_retry_at',
+              sqlite_where=text("status = 'PENDING'")),
+        Index('ix_jobs_dead_completed', 'completed_at',
+              sqlite_where=text("status = 'DEAD'")),
+    )
+    
     def __repr__(self):
         return f"<Job(id={self.id}, command='{self.command[:20]}...', status={self.status})>"
 
+# Indexes from earlier versions that the ones above replace
+_RETIRED_INDEXES = ('ix_jobs_claim', 'ix_jobs_status_completed', 'ix_jobs_pending_ready')
+
+# Engine and session registry are created once per process by init_db()
+_ENGINE = None
+_SESSION_FACTORY = None
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Let concurrent workers read while another one commits."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
 def get_db_session():
     """Create and return a database session."""
-    engine = init_db()
-    return scoped_session(sessionmaker(bind=engine))()
+    init_db()
+    return _SESSION_FACTORY()
 
 def init_db():
     """Initialize the database and return the engine."""
-    db_path = os.path.join(Path.home(), '.queuectl', 'jobs.db')
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
-    
-    engine = create_engine(f'sqlite:///{db_path}')
-    Base.metadata.create_all(engine)
-    return engine
+    global _ENGINE, _SESSION_FACTORY
+    if _ENGINE is None:
+        db_path = os.path.join(Path.home(), '.queuectl', 'jobs.db')
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        
+        _ENGINE = create_engine(f'sqlite:///{db_path}')
+        event.listen(_ENGINE, 'connect', _set_sqlite_pragmas)
+        Base.metadata.create_all(_ENGINE)
+        # create_all() skips indexes on tables that already exist
+        with _ENGINE.begin() as conn:
+            for index in Job.__table__.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+            for name in _RETIRED_INDEXES:
+                conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        # One thread-local session registry; objects stay readable after
+        # commit without another SELECT to refresh them
+        _SESSION_FACTORY = scoped_session(sessionmaker(bind=_ENGINE, expire_on_commit=False))
+    return _ENGINE
@@ -1,13 +1,69 @@
+import asyncio
+import functools
 import os
 import time
 import signal
-import subprocess
-from datetime import datetime, timedelta
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from sqlalchemy import func, select, update
 from .models import Job, JobStatus, get_db_session
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Touched whenever new work is queued, so idle workers (which usually run in
+# another process) notice it with a cheap stat() instead of querying the database
+WAKEUP_PATH = os.path.join(Path.home(), '.queuectl', 'wakeup')
+WAKEUP_CHECK_INTERVAL = 0.5  # seconds between wakeup file checks while idle
+MAX_IDLE_WAIT = 60  # seconds; re-poll the database at least this often
+OUTPUT_TAIL_BYTES = 4096  # how much of a failed job's stderr to keep
+
+def notify_workers():
+    """Wake idle workers because new work may be ready."""
+    try:
+        Path(WAKEUP_PATH).touch()
+    except OSError as e:
+        logger.debug(f"Could not touch wakeup file: {e}")
+
+def _read_tail(f, size=OUTPUT_TAIL_BYTES):
+    """Return the last `size` bytes written to a job's stderr file as text."""
+    f.seek(0, os.SEEK_END)
+    f.seek(max(f.tell() - size, 0))
+    return f.read().decode(errors='replace')
+
+async def _in_thread(fn, *args, **kwargs):
+    """Run a blocking database call without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+def _wakeup_mtime():
+    """Return the wakeup file's mtime, or None if it doesn't exist."""
+    try:
+        return os.stat(WAKEUP_PATH).st_mtime_ns
+    except OSError:
+        return None
+
+# Built once so each poll reuses the compiled statement from SQLAlchemy's cache.
+# Timestamps come from SQLite's clock so the claim needs no parameters at all
+_next_job_id = select(Job.id).where(
+    Job.status == JobStatus.PENDING,
+    (Job.next_retry_at.is_(None) | (Job.next_retry_at <= func.now()))
+).order_by(Job.created_at, Job.id).limit(1).scalar_subquery()
+
+_CLAIM_JOB = (
+    update(Job)
+    .where(Job.id == _next_job_id, Job.status == JobStatus.PENDING)
+    .values(
+        status=JobStatus.PROCESSING,
+        attempts=Job.attempts + 1,
+        started_at=func.now()
+    )
+    .returning(Job.id, Job.command, Job.attempts, Job.max_attempts, Job.backoff_base)
+    .execution_options(synchronize_session=False)
+)
+
 class Worker:
     def __init__(self, worker_id, max_jobs=10, shutdown_event=None):
         self.worker_id = worker_id
@@ -16,140 +72,176 @@ class Worker:
         self.current_job = None
         self.running = False
         
-    def start(self):
-        """Start the worker process."""
+    async def run(self):
+        """Run the worker until it is stopped or shut down."""
         self.running = True
         logger.info(f"Worker {self.worker_id} started")
         
         while self.running and not self.shutdown_event.is_set():
             try:
-                self._process_jobs()
-                time.sleep(1)  # Sleep to prevent busy waiting
+                # Read before polling so a job queued mid-poll still wakes us
+                wakeup = _wakeup_mtime()
+                if not await self._process_jobs():
+                    await self._wait_for_work(wakeup)
             except Exception as e:
                 logger.error(f"Worker {self.worker_id} error: {str(e)}", exc_info=True)
-                time.sleep(5)  # Sleep longer on error
+                await asyncio.sleep(5)  # Sleep longer on error
                 
     def stop(self):
         """Stop the worker process gracefully."""
         self.running = False
         logger.info(f"Worker {self.worker_id} stopping...")
         
-    def _process_jobs(self):
-        """Process pending jobs."""
+    async def _wait_for_work(self, wakeup):
+        """Sleep until a job is queued, the next retry is due or we shut down."""
+        deadline = time.monotonic() + await _in_thread(self._next_retry_delay)
+        while not self.shutdown_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, WAKEUP_CHECK_INTERVAL))
+            if _wakeup_mtime() != wakeup:
+                return
+    
+    def _next_retry_delay(self):
+        """Return seconds until the earliest scheduled retry, capped at MAX_IDLE_WAIT."""
         session = get_db_session()
         try:
-            # Find a pending job that's ready to be processed
-            job = session.query(Job).filter(
-                Job.status == JobStatus.PENDING,
-                (Job.next_retry_at.is_(None) | (Job.next_retry_at <= datetime.utcnow()))
-            ).order_by(Job.created_at).first()
-            
-            if not job:
-                return
-                
-            # Mark job as processing
-            job.status = JobStatus.PROCESSING
-            job.attempts += 1
-            job.started_at = datetime.utcnow()
+            next_retry_at = session.query(func.min(Job.next_retry_at)).filter(
+                Job.status == JobStatus.PENDING
+            ).scalar()
+        finally:
+            session.close()
+        
+        if next_retry_at is None:
+            return MAX_IDLE_WAIT
+        delay = (next_retry_at - datetime.utcnow()).total_seconds()
+        return min(max(delay, 0), MAX_IDLE_WAIT)
+    
+    async def _process_jobs(self):
+        """Process the next pending job, returning True if one was run."""
+        job = await _in_thread(self._claim_job)
+        if not job:
+            return False
+        
+        self.current_job = job
+        try:
+            await self._execute_job(job)
+        finally:
+            self.current_job = None
+        return True
+    
+    def _claim_job(self):
+        """Mark the next ready job as processing and return it, or None."""
+        session = get_db_session()
+        try:
+            # Find a pending job that's ready to be processed and mark it as
+            # processing in one statement, so two workers can't claim it. The
+            # returned row has everything needed to run the job, so it is
+            # never loaded (or refreshed after commit) as an ORM object
+            job = session.execute(_CLAIM_JOB).first()
             session.commit()
-            
-            self.current_job = job
-            self._execute_job(job, session)
-            
-        except Exception as e:
-            logger.error(f"Error processing job: {str(e)}", exc_info=True)
+            return job
+        except Exception:
             session.rollback()
+            raise
         finally:
-            self.current_job = None
             session.close()
     
-    def _execute_job(self, job, session):
+    async def _execute_job(self, job):
         """Execute the job command and handle the result."""
         logger.info(f"Worker {self.worker_id} executing job {job.id}: {job.command}")
         
         try:
-            # Execute the command
-            process = subprocess.Popen(
-                job.command,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            
-            # Wait for the process to complete with a timeout
-            try:
-                stdout, stderr = process.communicate(timeout=3600)  # 1 hour timeout
-                return_code = process.returncode
+            # Send stderr to a temporary file rather than a pipe, so a chatty
+            # job can't grow the worker's memory without bound; stdout is unused
+            with tempfile.TemporaryFile() as stderr:
+                process = await asyncio.create_subprocess_shell(
+                    job.command,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=stderr
+                )
                 
-                if return_code == 0:
-                    self._handle_success(job, session, stdout)
-                else:
-                    self._handle_failure(job, session, f"Command failed with return code {return_code}\n{stderr}")
+                # Wait for the process to complete with a timeout
+                try:
+                    return_code = await asyncio.wait_for(process.wait(), timeout=3600)  # 1 hour timeout
                     
-            except subprocess.TimeoutExpired:
-                process.kill()
-                self._handle_failure(job, session, "Job timed out after 1 hour")
+                    if return_code == 0:
+                        await self._handle_success(job)
+                    else:
+                        await self._handle_failure(job, f"Command failed with return code {return_code}\n{_read_tail(stderr)}")
+                        
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+                    await self._handle_failure(job, "Job timed out after 1 hour")
                 
         except Exception as e:
-            self._handle_failure(job, session, f"Error executing job: {str(e)}")
+            await self._handle_failure(job, f"Error executing job: {str(e)}")
     
-    def _handle_success(self, job, session, output):
+    async def _handle_success(self, job):
         """Handle a successfully completed job."""
-        job.status = JobStatus.COMPLETED
-        job.completed_at = datetime.utcnow()
-        session.commit()
+        await _in_thread(self._finish_job, job.id,
+                         status=JobStatus.COMPLETED,
+                         completed_at=func.now())
         logger.info(f"Job {job.id} completed successfully")
     
-    def _handle_failure(self, job, session, error):
+    async def _handle_failure(self, job, error):
         """Handle a failed job with retry logic."""
-        job.error = error
-        
         if job.attempts >= job.max_attempts:
-            job.status = JobStatus.DEAD
-            job.completed_at = datetime.utcnow()
+            await _in_thread(self._finish_job, job.id,
+                             status=JobStatus.DEAD,
+                             error=error,
+                             completed_at=func.now())
             logger.error(f"Job {job.id} failed after {job.attempts} attempts and moved to DLQ")
         else:
             # Calculate next retry time using exponential backoff
             backoff = (job.backoff_base ** job.attempts) * 60  # in seconds
-            job.next_retry_at = datetime.utcnow() + timedelta(seconds=backoff)
-            job.status = JobStatus.PENDING
+            await _in_thread(self._finish_job, job.id,
+                             status=JobStatus.PENDING,
+                             error=error,
+                             next_retry_at=func.datetime('now', f'+{backoff} seconds'))
+            notify_workers()  # let idle workers pick up the new retry time
             logger.warning(
                 f"Job {job.id} failed (attempt {job.attempts}/{job.max_attempts}). "
                 f"Retrying in {backoff} seconds"
             )
-        
-        session.commit()
+    
+    def _finish_job(self, job_id, **values):
+        """Record the outcome of a job with a single UPDATE and commit."""
+        session = get_db_session()
+        try:
+            session.execute(
+                update(Job)
+                .where(Job.id == job_id)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+async def _run_workers(workers):
+    """Run all workers concurrently on the current event loop."""
+    await asyncio.gather(*(worker.run() for worker in workers))
 
 def start_workers(count=1):
-    """Start multiple worker processes."""
-    import threading
-    
+    """Start multiple workers sharing one event loop and connection pool."""
     shutdown_event = threading.Event()
-    workers = []
     
     def signal_handler(sig, frame):
         logger.info("Shutting down workers...")
         shutdown_event.set()
-        for worker in workers:
-            if worker.is_alive():
-                worker.join(timeout=5)
     
     # Set up signal handlers for graceful shutdown
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
-    # Start worker threads
-    for i in range(count):
-        worker = threading.Thread(
-            target=Worker(i + 1, shutdown_event=shutdown_event).start,
-            daemon=True
-        )
-        worker.start()
-        workers.append(worker)
-    
-    # Wait for all workers to complete
-    for worker in workers:
-        worker.join()
+    # Workers finish their current job before returning
+    workers = [Worker(i + 1, shutdown_event=shutdown_event) for i in range(count)]
+    asyncio.run(_run_workers(workers))
     
     logger.info("All workers stopped")
@@ -6,7 +6,7 @@ setup(
     packages=find_packages(),
     install_requires=[
         'click>=8.0.0',
-        'SQLAlchemy>=1.4.0',
+        'SQLAlchemy>=2.0',
         'python-dateutil>=2.8.0',
         'tabulate>=0.8.0',
         'pywin32>=300; sys_platform == "win32"',